@@ -106,6 +106,12 @@ def start_local_scheduler(plasma_store_name,
                            stdout=stdout_file, stderr=stderr_file)
     time.sleep(1.0)
   else:
-    pid = subprocess.Popen(command, stdout=stdout_file, stderr=stderr_file)
+    # close_fds keeps stray descriptors out of the child, at the cost of
+    # making the spawn a plain fork+exec on Python 3.8-3.12, which only use
+    # posix_spawn when descriptors are inherited. No preexec_fn or shell is
+    # passed here; either one would force the RSS-proportional fork even on
+    # Python 3.13+, where close_fds no longer disqualifies posix_spawn.
+    pid = subprocess.Popen(command, stdout=stdout_file, stderr=stderr_file,
+                           close_fds=True)
     time.sleep(0.1)
   return local_scheduler_name, pid
@@ -328,7 +328,13 @@ def start_plasma_store(plasma_store_memory=DEFAULT_PLASMA_STORE_MEMORY,
                            stdout=stdout_file, stderr=stderr_file)
     time.sleep(1.0)
   else:
-    pid = subprocess.Popen(command, stdout=stdout_file, stderr=stderr_file)
+    # close_fds keeps stray descriptors out of the child, at the cost of
+    # making the spawn a plain fork+exec on Python 3.8-3.12, which only use
+    # posix_spawn when descriptors are inherited. No preexec_fn or shell is
+    # passed here; either one would force the RSS-proportional fork even on
+    # Python 3.13+, where close_fds no longer disqualifies posix_spawn.
+    pid = subprocess.Popen(command, stdout=stdout_file, stderr=stderr_file,
+                           close_fds=True)
     time.sleep(0.1)
   return plasma_store_name, pid
 
@@ -391,7 +397,7 @@ def start_plasma_manager(store_name, redis_address, node_ip_address="127.0.0.1",
                                  stdout=stdout_file, stderr=stderr_file)
     else:
       process = subprocess.Popen(command, stdout=stdout_file,
-                                 stderr=stderr_file)
+                                 stderr=stderr_file, close_fds=True)
     # This sleep is critical. If the plasma_manager fails to start because the
     # port is already in use, then we need it to fail within 0.1 seconds.
     time.sleep(0.1)
@@ -3,6 +3,9 @@ from __future__ import division
 from __future__ import print_function
 
 from collections import namedtuple, OrderedDict
+import concurrent.futures
+import functools
+import itertools
 import multiprocessing
 import os
 import psutil
@@ -44,42 +47,220 @@ all_processes = OrderedDict([(PROCESS_TYPE_MONITOR, []),
                              (PROCESS_TYPE_REDIS_SERVER, []),
                              (PROCESS_TYPE_WEB_UI, [])],)
 
+# This lock protects all_processes. Process startup may be parallelized across
+# several threads, all of which record the processes they start in
+# all_processes. The lock is reentrant because the SIGTERM handler below runs
+# cleanup() on the main thread, and the signal may arrive while the main
+# thread already holds the lock; a plain lock would deadlock there instead of
+# shutting down.
+all_processes_lock = threading.RLock()
+
 # True if processes are run in the valgrind profiler.
 RUN_LOCAL_SCHEDULER_PROFILER = False
 RUN_PLASMA_MANAGER_PROFILER = False
 RUN_PLASMA_STORE_PROFILER = False
 
+# The directory containing this file, along with the paths of the files that
+# the start_* functions launch. These are computed once at import time so that
+# the startup path does not redo the same path manipulation on every call.
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+_REDIS_EXECUTABLE = os.path.join(_MODULE_DIR, "core/src/common/thirdparty/redis/src/redis-server")
+_REDIS_MODULE = os.path.join(_MODULE_DIR, "core/src/common/redis_module/libray_redis_module.so")
+_MONITOR_PATH = os.path.join(_MODULE_DIR, "monitor.py")
+_DEFAULT_WORKER_PATH = os.path.join(_MODULE_DIR, "workers/default_worker.py")
+_WEBUI_BACKEND_PATH = os.path.join(_MODULE_DIR, "../../webui/backend/ray_ui.py")
+_WEBUI_DIRECTORY = os.path.join(_MODULE_DIR, "../../webui/")
+
+# The Python executable used to run the web UI backend. The web UI requires
+# Python 3, so under Python 2 we look for a python3 binary on the PATH. The
+# lookup happens once at import time, with no subprocess involved, and is None
+# if no suitable executable exists.
+if sys.version_info >= (3, 0):
+  _WEBUI_PYTHON_EXECUTABLE = "python"
+else:
+  # Python 2 has no shutil.which, so fall back to the distutils equivalent.
+  from distutils.spawn import find_executable as _find_executable
+  _WEBUI_PYTHON_EXECUTABLE = _find_executable("python3")
+
+# True once we have checked that the Redis files exist. The check only needs
+# to happen on the first call to start_redis.
+_redis_files_checked = False
+
+# The directory that log files are written to. It is created on the first call
+# to new_log_files and assumed to exist afterwards, so that a startup that
+# opens many log files pays for one mkdir instead of a stat per call.
+_LOGS_DIR = "/tmp/raylogs"
+_logs_dir_created = False
+
+# Counter used together with the process id to make log file names unique.
+# The counter alone would not be enough, since it starts at zero in every
+# driver process and separate runs must not append to each other's files.
+# next() on a count object is atomic under the GIL, so this is safe to use
+# from the concurrent startup paths, unlike the shared random generator state
+# it replaces.
+_log_id_counter = itertools.count()
+
+# Keyword arguments used for every subprocess.Popen call in this module.
+# close_fds keeps stray descriptors (Redis client sockets, log files opened by
+# other threads) out of the children. It is already the default on Python 3;
+# passing it explicitly matters on Python 2, which defaults to inheriting
+# everything.
+_POPEN_KWARGS = {"close_fds": True}
+
+# On Linux, subprocess can start children with posix_spawn, which is vfork
+# based and avoids copying the parent's page tables. Because every Popen call
+# in this module passes close_fds=True, that path is only taken on Python
+# 3.13+, where closing descriptors no longer disqualifies posix_spawn; the
+# calls here must additionally avoid preexec_fn, since with vfork the child
+# must not run arbitrary Python (or allocate) between vfork and exec. The
+# flag below is an internal CPython detail, so we only warn when it is known
+# to be off on a version where it would otherwise apply.
+if (sys.version_info >= (3, 13) and sys.platform.startswith("linux")
+    and not getattr(subprocess, "_USE_POSIX_SPAWN", True)):
+  print("Warning: subprocess is not using posix_spawn, so starting Ray "
+        "processes may be slow when the driver is using a lot of memory.")
+
+# The number of CPUs available to this process. Unlike
+# multiprocessing.cpu_count, os.sched_getaffinity respects cgroup cpusets, so
+# inside a container this is the number of CPUs the container may actually
+# use.
+if hasattr(os, "sched_getaffinity"):
+  _CPU_COUNT = len(os.sched_getaffinity(0))
+else:
+  _CPU_COUNT = multiprocessing.cpu_count()
+
 # ObjectStoreAddress tuples contain all information necessary to connect to an
 # object store. The fields are:
 # - name: The socket name for the object store
 # - manager_name: The socket name for the object store manager
 # - manager_port: The Internet port that the object store manager listens on
+# - plasma_address: The "IP:port" address of the object store manager. This is
+#     formatted once when the tuple is constructed so that consumers do not
+#     each reformat it from the other fields.
 ObjectStoreAddress = namedtuple("ObjectStoreAddress", ["name",
                                                        "manager_name",
-                                                       "manager_port"])
+                                                       "manager_port",
+                                                       "plasma_address"])
+
+# An address parsed into its IP address and integer port.
+RedisAddress = namedtuple("RedisAddress", ["ip_address", "port"])
 
 def address(ip_address, port):
   return ip_address + ":" + str(port)
 
-def get_ip_address(address):
+def parse_address(address):
+  """Parse an "IP:port" string into a RedisAddress tuple.
+
+  Using rsplit on the final colon keeps the IP address intact even if it
+  contains colons itself.
+  """
   try:
-    ip_address = address.split(":")[0]
-  except:
-    raise Exception("Unable to parse IP address from address {}".format(address))
-  return ip_address
+    ip_address, port = address.rsplit(":", 1)
+    port = int(port)
+  except ValueError:
+    raise Exception("Unable to parse IP address and port from address "
+                    "{}".format(address))
+  return RedisAddress(ip_address, port)
+
+def get_ip_address(address):
+  return parse_address(address).ip_address
 
 def get_port(address):
-  try:
-    port = int(address.split(":")[1])
-  except:
-    raise Exception("Unable to parse port from address {}".format(address))
-  return port
+  return parse_address(address).port
+
+# Use a generator seeded from the operating system so that Ray processes
+# started at the same time on different nodes do not draw the same "random"
+# ports and names from identically seeded generators.
+_random = random.SystemRandom()
 
 def new_port():
-  return random.randint(10000, 65535)
+  # Ask the kernel for a free port by binding to port 0 and immediately
+  # releasing it. This avoids picking a port that is already in use and then
+  # paying for a retry.
+  try:
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    s.bind(("", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+  except socket.error:
+    return _random.randint(10000, 65535)
 
 def random_name():
-  return str(random.randint(0, 99999999))
+  return str(_random.randint(0, 99999999))
+
+def _port_connectable(ip_address, port):
+  """Check if a TCP connection to the given address and port succeeds."""
+  s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+  s.settimeout(0.1)
+  try:
+    return s.connect_ex((ip_address, port)) == 0
+  finally:
+    s.close()
+
+def _wait_healthy(p, check=None, timeout=0.1, step=0.005):
+  """Wait for a recently started process to be healthy.
+
+  This polls the process in small increments instead of sleeping for the full
+  timeout, so that a process that exits early (or that passes the readiness
+  check) is detected after a few milliseconds.
+
+  Args:
+    p: The Popen object for the process to wait for.
+    check: An optional function that returns True once the process is known to
+      be ready. If this is None, the process is considered healthy as long as
+      it is still alive when the timeout expires.
+    timeout (float): The maximum number of seconds to wait.
+    step (float): The number of seconds to sleep between polls.
+
+  Returns:
+    True if the process is healthy and False if it has exited.
+  """
+  deadline = time.time() + timeout
+  while True:
+    if p.poll() is not None:
+      return False
+    if check is not None and check():
+      return True
+    if time.time() >= deadline:
+      return p.poll() is None
+    time.sleep(step)
+
+def _wait_ready_tcp(ip_address, port, timeout=2.0):
+  """Wait until a TCP connection to the given address and port succeeds.
+
+  This polls with exponential backoff starting at 1ms, so a server that is
+  already listening is detected almost immediately.
+
+  Returns:
+    True if the port became connectable within the timeout, False otherwise.
+  """
+  delay = 0.001
+  deadline = time.time() + timeout
+  while True:
+    if _port_connectable(ip_address, port):
+      return True
+    if time.time() >= deadline:
+      return False
+    time.sleep(delay)
+    delay = min(0.1, delay * 2)
+
+def _wait_ready_uds(path, timeout=2.0):
+  """Wait until a unix domain socket exists at the given path.
+
+  Returns:
+    True if the socket appeared within the timeout, False otherwise.
+  """
+  delay = 0.001
+  deadline = time.time() + timeout
+  while True:
+    if os.path.exists(path):
+      return True
+    if time.time() >= deadline:
+      return False
+    time.sleep(delay)
+    delay = min(0.1, delay * 2)
 
 def kill_process(p):
   """Kill a process.
@@ -98,12 +279,21 @@ def kill_process(p):
 
   # Allow the process one second to exit gracefully.
   p.terminate()
-  timer = threading.Timer(1, lambda p: p.kill(), [p])
-  try:
-    timer.start()
-    p.wait()
-  finally:
-    timer.cancel()
+  if sys.version_info >= (3, 3):
+    # Popen.wait takes a timeout, so no watchdog timer thread is needed.
+    try:
+      p.wait(timeout=1)
+    except subprocess.TimeoutExpired:
+      pass
+  else:
+    # On Python 2 there is no timeout argument, so use a timer thread that
+    # force kills the process if it does not exit within one second.
+    timer = threading.Timer(1, lambda p: p.kill(), [p])
+    try:
+      timer.start()
+      p.wait()
+    finally:
+      timer.cancel()
 
   if p.poll() is not None:
     return True
@@ -125,30 +315,75 @@ def cleanup():
   started and disconnected by worker.py.
   """
   successfully_shut_down = True
-  # Terminate the processes in reverse order.
+  # Terminate the process types in order. The processes within one type are
+  # independent of each other, so kill them in parallel and the one second
+  # grace periods in kill_process overlap instead of accumulating.
   for process_type in all_processes.keys():
-    # Kill all of the processes of a certain type.
-    for p in all_processes[process_type]:
-      success = kill_process(p)
-      successfully_shut_down = successfully_shut_down and success
-    # Reset the list of processes of this type.
-    all_processes[process_type] = []
+    with all_processes_lock:
+      processes = all_processes[process_type]
+      # Reset the list of processes of this type.
+      all_processes[process_type] = []
+    if len(processes) > 0:
+      with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(processes), 32)) as executor:
+        for success in executor.map(kill_process, processes):
+          successfully_shut_down = successfully_shut_down and success
   if not successfully_shut_down:
     print("Ray did not shut down properly.")
 
-def all_processes_alive(exclude=[]):
+def _sigterm_handler(signum, frame):
+  """Shut down the Ray processes when this process receives a SIGTERM.
+
+  Without this handler a SIGTERM (for example from a container runtime being
+  shut down) would end this process immediately and orphan the children, which
+  would then be SIGKILL'd without a chance to exit gracefully. Note that
+  cleanup() empties the process lists as it goes, so running it both here and
+  at exit does not kill anything twice. If the application installed its own
+  SIGTERM handler before importing this module, it runs after cleanup().
+  """
+  cleanup()
+  if callable(_previous_sigterm_handler):
+    _previous_sigterm_handler(signum, frame)
+  # Exit with the conventional status for death by this signal (143 for
+  # SIGTERM) so that supervisors and scripts checking the exit status do not
+  # mistake the termination for a successful run.
+  sys.exit(128 + signum)
+
+# Signal handlers can only be registered from the main thread. If this module
+# is imported from another thread, SIGTERM keeps its default behavior.
+if hasattr(threading, "main_thread"):
+  _in_main_thread = threading.current_thread() is threading.main_thread()
+else:
+  # Python 2 has no threading.main_thread.
+  _in_main_thread = isinstance(threading.current_thread(), threading._MainThread)
+if _in_main_thread:
+  # Keep a reference to any handler the embedding application registered
+  # before importing this module, so that installing ours does not silently
+  # replace it.
+  _previous_sigterm_handler = signal.getsignal(signal.SIGTERM)
+  signal.signal(signal.SIGTERM, _sigterm_handler)
+
+def all_processes_alive(exclude=None):
   """Check if all of the processes are still alive.
 
   Args:
     exclude: Don't check the processes whose types are in this list.
   """
+  exclude = frozenset(exclude if exclude is not None else ())
   for process_type, processes in all_processes.items():
+    if process_type in exclude:
+      continue
     # Note that p.poll() returns the exit code that the process exited with, so
-    # an exit code of None indicates that the process is still alive.
-    if not all([p.poll() is None for p in processes]) and process_type not in exclude:
+    # an exit code of None indicates that the process is still alive. The
+    # generator lets any() stop polling at the first dead process.
+    if any(p.poll() is not None for p in processes):
       return False
   return True
 
+# Cache of results from get_node_ip_address, keyed on the probe address. The
+# connect call below costs a kernel route lookup each time, and the answer
+# does not change while this process is running.
+_node_ip_address_cache = {}
+
 def get_node_ip_address(address="8.8.8.8:53"):
   """Determine the IP address of the local node.
 
@@ -159,12 +394,44 @@ def get_node_ip_address(address="8.8.8.8:53"):
   Returns:
     The IP address of the current node.
   """
-  ip_address, port = address.split(":")
+  if address in _node_ip_address_cache:
+    return _node_ip_address_cache[address]
+  ip_address, port = parse_address(address)
   s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-  s.connect((ip_address, int(port)))
-  return s.getsockname()[0]
-
-def wait_for_redis_to_start(redis_ip_address, redis_port, num_retries=5):
+  try:
+    # Connecting a UDP socket does not send any packets; it only resolves the
+    # route and therefore the local address used to reach the probe address.
+    s.connect((ip_address, port))
+    node_ip_address = s.getsockname()[0]
+  except socket.error:
+    # The probe address is not routable, for example on a machine with no
+    # network access, so fall back to the address of the hostname.
+    node_ip_address = socket.gethostbyname(socket.gethostname())
+  finally:
+    s.close()
+  _node_ip_address_cache[address] = node_ip_address
+  return node_ip_address
+
+def _new_redis_client(redis_ip_address, redis_port, socket_timeout=None):
+  """Create a Redis client with TCP keepalive enabled.
+
+  Keepalive (with retries on timeouts) lets long-lived connections survive
+  transient network blips without an explicit retry wrapper at every call
+  site. A socket_timeout can be passed for clients used as probes, so that a
+  server that accepts connections but never answers cannot hang a command
+  forever.
+  """
+  keepalive_options = {}
+  if hasattr(socket, "TCP_KEEPIDLE"):
+    keepalive_options[socket.TCP_KEEPIDLE] = 60
+  return redis.StrictRedis(host=redis_ip_address, port=redis_port,
+                           socket_timeout=socket_timeout,
+                           socket_keepalive=True,
+                           socket_keepalive_options=keepalive_options,
+                           retry_on_timeout=True)
+
+def wait_for_redis_to_start(redis_ip_address, redis_port, timeout=5,
+                            redis_client=None):
   """Wait for a Redis server to be available.
 
   This is accomplished by creating a Redis client and sending a random command
@@ -173,29 +440,44 @@ def wait_for_redis_to_start(redis_ip_address, redis_port, num_retries=5):
   Args:
     redis_ip_address (str): The IP address of the redis server.
     redis_port (int): The port of the redis server.
-    num_retries (int): The number of times to try connecting with redis. The
-      client will sleep for one second between attempts.
+    timeout (float): The number of seconds to keep trying to connect to redis
+      before giving up.
+    redis_client: An existing Redis client to reuse. If this is None, a new
+      client is created.
+
+  Returns:
+    The Redis client that was used, so that callers can reuse its connection.
 
   Raises:
     Exception: An exception is raised if we could not connect with Redis.
   """
-  redis_client = redis.StrictRedis(host=redis_ip_address, port=redis_port)
-  # Wait for the Redis server to start.
-  counter = 0
-  while counter < num_retries:
+  if redis_client is None:
+    # Give the probe client a bounded socket timeout: if something else owns
+    # the port and sits silently on accepted connections, the PING below
+    # would otherwise block forever. Redis timeouts are connection errors, so
+    # they feed the retry loop like a refused connection does.
+    redis_client = _new_redis_client(redis_ip_address, redis_port,
+                                     socket_timeout=1)
+  # Wait for the Redis server to start. Retry with exponential backoff plus
+  # jitter so that a server that comes up quickly is detected after only a few
+  # milliseconds, while a slow boot still gets the full timeout. Cap the delay
+  # at one second so that backoff does not penalize slow starts.
+  delay = 0.001
+  deadline = time.time() + timeout
+  while True:
     try:
-      # Run some random command and see if it worked.
-      print("Waiting for redis server at {}:{} to respond...".format(redis_ip_address, redis_port))
-      redis_client.client_list()
+      # Send a PING and see if it gets through. This is lighter than a command
+      # like CLIENT LIST, whose response grows with the number of clients.
+      redis_client.ping()
     except redis.ConnectionError as e:
+      if time.time() >= deadline:
+        raise Exception("Unable to connect to Redis. If the Redis instance is on a different machine, check that your firewall is configured properly.")
       # Wait a little bit.
-      time.sleep(1)
-      print("Failed to connect to the redis server, retrying.")
-      counter += 1
+      time.sleep(delay + random.uniform(0, delay / 2))
+      delay = min(1.0, delay * 2)
     else:
       break
-  if counter == num_retries:
-    raise Exception("Unable to connect to Redis. If the Redis instance is on a different machine, check that your firewall is configured properly.")
+  return redis_client
 
 def start_redis(port=None, num_retries=20, stdout_file=None, stderr_file=None,
                 cleanup=True):
@@ -219,10 +501,11 @@ def start_redis(port=None, num_retries=20, stdout_file=None, stderr_file=None,
   Raises:
     Exception: An exception is raised if Redis could not be started.
   """
-  redis_filepath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "./core/src/common/thirdparty/redis/src/redis-server")
-  redis_module = os.path.join(os.path.dirname(os.path.abspath(__file__)), "./core/src/common/redis_module/libray_redis_module.so")
-  assert os.path.isfile(redis_filepath)
-  assert os.path.isfile(redis_module)
+  global _redis_files_checked
+  if not _redis_files_checked:
+    assert os.path.isfile(_REDIS_EXECUTABLE)
+    assert os.path.isfile(_REDIS_MODULE)
+    _redis_files_checked = True
   counter = 0
   if port is not None:
     if num_retries != 1:
@@ -232,35 +515,60 @@ def start_redis(port=None, num_retries=20, stdout_file=None, stderr_file=None,
   while counter < num_retries:
     if counter > 0:
       print("Redis failed to start, retrying now.")
-    p = subprocess.Popen([redis_filepath,
+    p = subprocess.Popen([_REDIS_EXECUTABLE,
                           "--port", str(port),
                           "--loglevel", "warning",
-                          "--loadmodule", redis_module],
-                          stdout=stdout_file, stderr=stderr_file)
-    time.sleep(0.1)
-    # Check if Redis successfully started (or at least if it the executable did
-    # not exit within 0.1 seconds).
+                          "--loadmodule", _REDIS_MODULE],
+                          stdout=stdout_file, stderr=stderr_file,
+                          **_POPEN_KWARGS)
+    # Check if Redis successfully started. The port accepting connections is
+    # the readiness signal, so a healthy server is usually detected after a
+    # single 5ms poll instead of a 100ms sleep. The connection check alone
+    # would also succeed if another process already owns the port (which is
+    # exactly the collision this loop retries on), so the attempt only counts
+    # once the server answers a PING while our child is still alive. A
+    # redis-server that loses the bind race exits almost immediately.
+    redis_port_check = lambda: _port_connectable("127.0.0.1", port)
+    redis_client = None
+    if _wait_healthy(p, check=redis_port_check):
+      try:
+        redis_client = wait_for_redis_to_start("127.0.0.1", port)
+      except Exception:
+        # With a user-specified port there is nothing to retry with, so
+        # report the failure. With a random port, fall through and try a new
+        # one.
+        if num_retries == 1:
+          raise
+      else:
+        if p.poll() is None:
+          if cleanup:
+            with all_processes_lock:
+              all_processes[PROCESS_TYPE_REDIS_SERVER].append(p)
+          break
+        # The PING was answered by a foreign server; our child is dead.
+        redis_client = None
     if p.poll() is None:
-      if cleanup:
-        all_processes[PROCESS_TYPE_REDIS_SERVER].append(p)
-      break
+      # Don't leak a child that came up but failed the checks above.
+      kill_process(p)
     port = new_port()
     counter += 1
   if counter == num_retries:
     raise Exception("Couldn't start Redis.")
 
-  # Create a Redis client just for configuring Redis.
-  redis_client = redis.StrictRedis(host="127.0.0.1", port=port)
-  # Wait for the Redis server to start.
-  wait_for_redis_to_start("127.0.0.1", port)
+  # Reuse the client that the liveness check created to configure the server
+  # below, which avoids a second TCP connection and handshake.
+  # Batch the configuration commands into one pipeline so they cost a single
+  # round trip instead of three.
+  pipe = redis_client.pipeline(transaction=False)
   # Configure Redis to generate keyspace notifications. TODO(rkn): Change this
   # to only generate notifications for the export keys.
-  redis_client.config_set("notify-keyspace-events", "Kl")
+  pipe.config_set("notify-keyspace-events", "Kl")
   # Configure Redis to not run in protected mode so that processes on other
   # hosts can connect to it. TODO(rkn): Do this in a more secure way.
-  redis_client.config_set("protected-mode", "no")
+  pipe.config_set("protected-mode", "no")
   # Put a time stamp in Redis to indicate when it was started.
-  redis_client.set("redis_start_time", time.time())
+  pipe.set("redis_start_time", time.time())
+  pipe.execute()
   return port, p
 
 def start_global_scheduler(redis_address, stdout_file=None, stderr_file=None,
@@ -281,7 +589,8 @@ def start_global_scheduler(redis_address, stdout_file=None, stderr_file=None,
                                               stdout_file=stdout_file,
                                               stderr_file=stderr_file)
   if cleanup:
-    all_processes[PROCESS_TYPE_GLOBAL_SCHEDULER].append(p)
+    with all_processes_lock:
+      all_processes[PROCESS_TYPE_GLOBAL_SCHEDULER].append(p)
 
 def start_webui(redis_address, backend_stdout_file=None,
                 backend_stderr_file=None, polymer_stdout_file=None,
@@ -309,28 +618,28 @@ def start_webui(redis_address, backend_stdout_file=None,
   Return:
     True if the web UI was successfully started, otherwise false.
   """
-  webui_backend_filepath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../webui/backend/ray_ui.py")
-  webui_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../webui/")
-
-  if sys.version_info >= (3, 0):
-    python_executable = "python"
-  else:
-    # If the user is using Python 2, it is still possible to run the webserver
-    # separately with Python 3, so try to find a Python 3 executable.
-    try:
-      python_executable = subprocess.check_output(["which", "python3"]).decode("ascii").strip()
-    except Exception as e:
-      print("Not starting the web UI because the web UI requires Python 3.")
-      return False
+  # If the user is using Python 2, it is still possible to run the webserver
+  # separately with Python 3 if one was found on the PATH.
+  python_executable = _WEBUI_PYTHON_EXECUTABLE
+  if python_executable is None:
+    print("Not starting the web UI because the web UI requires Python 3.")
+    return False
 
   backend_process = subprocess.Popen([python_executable,
-                                      webui_backend_filepath,
+                                      _WEBUI_BACKEND_PATH,
                                       "--redis-address", redis_address],
                                       stdout=backend_stdout_file,
-                                      stderr=backend_stderr_file)
-
-  time.sleep(0.1)
-  if backend_process.poll() is not None:
+                                      stderr=backend_stderr_file,
+                                      **_POPEN_KWARGS)
+
+  # The backend serves websockets on port 8888. Succeed as soon as the port
+  # accepts a connection rather than waiting out the full probe window. The
+  # port would also answer if another driver's backend already owns it while
+  # ours exits on the bind failure, so additionally require the child to
+  # survive a short confirmation window.
+  if not (_wait_healthy(backend_process,
+                        check=lambda: _port_connectable("127.0.0.1", 8888))
+          and _wait_healthy(backend_process, timeout=0.1)):
     # Failed to start the web UI.
     print("The web UI failed to start.")
     return False
@@ -340,9 +649,10 @@ def start_webui(redis_address, backend_stdout_file=None,
   # using the port and prevent polymer from using it.
   try:
     polymer_process = subprocess.Popen(["polymer", "serve", "--port", "8080"],
-                                       cwd=webui_directory,
+                                       cwd=_WEBUI_DIRECTORY,
                                        stdout=polymer_stdout_file,
-                                       stderr=polymer_stderr_file)
+                                       stderr=polymer_stderr_file,
+                                       **_POPEN_KWARGS)
   except Exception as e:
     print("Failed to start polymer.")
     # Kill the backend since it won't work without polymer.
@@ -352,11 +662,15 @@ def start_webui(redis_address, backend_stdout_file=None,
       pass
     return False
 
-  # Unfortunately this block of code is unlikely to catch any problems because
-  # when polymer throws an error on startup, it is typically after several
-  # seconds.
-  time.sleep(0.1)
-  if polymer_process.poll() is not None:
+  # Wait until polymer accepts connections on port 8080 or crashes. When
+  # polymer throws an error on startup it is typically after several seconds,
+  # so a process that is still alive when the probe window closes is given the
+  # benefit of the doubt. As with the backend, the port answering is only
+  # trusted if our own child also survives a short confirmation window.
+  if not (_wait_healthy(polymer_process,
+                        check=lambda: _port_connectable("127.0.0.1", 8080),
+                        timeout=0.5)
+          and _wait_healthy(polymer_process, timeout=0.1)):
     # Failed to start polymer.
     print("Failed to serve the web UI with polymer.")
     # Kill the backend since it won't work without polymer.
@@ -367,8 +681,9 @@ def start_webui(redis_address, backend_stdout_file=None,
     return False
 
   if cleanup:
-    all_processes[PROCESS_TYPE_WEB_UI].append(backend_process)
-    all_processes[PROCESS_TYPE_WEB_UI].append(polymer_process)
+    with all_processes_lock:
+      all_processes[PROCESS_TYPE_WEB_UI].append(backend_process)
+      all_processes[PROCESS_TYPE_WEB_UI].append(polymer_process)
 
   return True
 
@@ -411,9 +726,9 @@ def start_local_scheduler(redis_address,
     The name of the local scheduler socket.
   """
   if num_cpus is None:
-    # By default, use the number of hardware execution threads for the number of
-    # cores.
-    num_cpus = multiprocessing.cpu_count()
+    # By default, use the number of CPUs available to this process for the
+    # number of cores.
+    num_cpus = _CPU_COUNT
   if num_gpus is None:
     # By default, assume this node has no GPUs.
     num_gpus = 0
@@ -430,9 +745,44 @@ def start_local_scheduler(redis_address,
       static_resource_list=[num_cpus, num_gpus],
       num_workers=num_workers)
   if cleanup:
-    all_processes[PROCESS_TYPE_LOCAL_SCHEDULER].append(p)
+    with all_processes_lock:
+      all_processes[PROCESS_TYPE_LOCAL_SCHEDULER].append(p)
   return local_scheduler_name
 
+# The memoized result of _get_default_objstore_memory. The system memory and
+# the size of /dev/shm do not change while this process is running, so the
+# computation only needs to happen once even when many object stores are
+# started.
+_default_objstore_memory = None
+
+def _get_default_objstore_memory():
+  """Compute a fraction of the system memory for the Plasma store to use."""
+  global _default_objstore_memory
+  if _default_objstore_memory is not None:
+    return _default_objstore_memory
+  system_memory = psutil.virtual_memory().total
+  if sys.platform == "linux" or sys.platform == "linux2":
+    # On linux we use /dev/shm, its size is half the size of the physical
+    # memory. To not overflow it, we set the plasma memory limit to 0.4 times
+    # the size of the physical memory.
+    objstore_memory = int(system_memory * 0.4)
+    # Compare the requested memory size to the memory available in /dev/shm.
+    shm_fs_stats = os.statvfs("/dev/shm")
+    # The value shm_fs_stats.f_bsize is the block size and the value
+    # shm_fs_stats.f_bavail is the number of available blocks.
+    shm_avail = shm_fs_stats.f_bsize * shm_fs_stats.f_bavail
+    if objstore_memory > shm_avail:
+      print("Warning: Reducing object store memory because /dev/shm has "
+            "only {} bytes available. You may be able to free up space by "
+            "deleting files in /dev/shm. If you are inside a Docker "
+            "container, you may need to pass an argument with the flag "
+            "'--shm-size' to 'docker run'.".format(shm_avail))
+      objstore_memory = int(shm_avail * 0.8)
+  else:
+    objstore_memory = int(system_memory * 0.8)
+  _default_objstore_memory = objstore_memory
+  return objstore_memory
+
 def start_objstore(node_ip_address, redis_address, object_manager_port=None,
                    store_stdout_file=None, store_stderr_file=None,
                    manager_stdout_file=None, manager_stderr_file=None,
@@ -463,31 +813,7 @@ def start_objstore(node_ip_address, redis_address, object_manager_port=None,
       the plasma manager port.
   """
   if objstore_memory is None:
-    # Compute a fraction of the system memory for the Plasma store to use.
-    system_memory = psutil.virtual_memory().total
-    if sys.platform == "linux" or sys.platform == "linux2":
-      # On linux we use /dev/shm, its size is half the size of the physical
-      # memory. To not overflow it, we set the plasma memory limit to 0.4 times
-      # the size of the physical memory.
-      objstore_memory = int(system_memory * 0.4)
-      # Compare the requested memory size to the memory available in /dev/shm.
-      shm_fd = os.open("/dev/shm", os.O_RDONLY)
-      try:
-        shm_fs_stats = os.fstatvfs(shm_fd)
-        # The value shm_fs_stats.f_bsize is the block size and the value
-        # shm_fs_stats.f_bavail is the number of available blocks.
-        shm_avail = shm_fs_stats.f_bsize * shm_fs_stats.f_bavail
-        if objstore_memory > shm_avail:
-          print("Warning: Reducing object store memory because /dev/shm has "
-                "only {} bytes available. You may be able to free up space by "
-                "deleting files in /dev/shm. If you are inside a Docker "
-                "container, you may need to pass an argument with the flag "
-                "'--shm-size' to 'docker run'.".format(shm_avail))
-          objstore_memory = int(shm_avail * 0.8)
-      finally:
-        os.close(shm_fd)
-    else:
-      objstore_memory = int(system_memory * 0.8)
+    objstore_memory = _get_default_objstore_memory()
   # Start the Plasma store.
   plasma_store_name, p1 = ray.plasma.start_plasma_store(
       plasma_store_memory=objstore_memory,
@@ -515,11 +841,13 @@ def start_objstore(node_ip_address, redis_address, object_manager_port=None,
         stdout_file=manager_stdout_file,
         stderr_file=manager_stderr_file)
   if cleanup:
-    all_processes[PROCESS_TYPE_PLASMA_STORE].append(p1)
-    all_processes[PROCESS_TYPE_PLASMA_MANAGER].append(p2)
+    with all_processes_lock:
+      all_processes[PROCESS_TYPE_PLASMA_STORE].append(p1)
+      all_processes[PROCESS_TYPE_PLASMA_MANAGER].append(p2)
 
   return ObjectStoreAddress(plasma_store_name, plasma_manager_name,
-                            plasma_manager_port)
+                            plasma_manager_port,
+                            address(node_ip_address, plasma_manager_port))
 
 def start_worker(node_ip_address, object_store_name, object_store_manager_name,
                  local_scheduler_name, redis_address, worker_path,
@@ -543,16 +871,30 @@ def start_worker(node_ip_address, object_store_name, object_store_manager_name,
       this process will be killed by services.cleanup() when the Python process
       that imported services exits. This is True by default.
   """
-  command = ["python",
-             worker_path,
-             "--node-ip-address=" + node_ip_address,
-             "--object-store-name=" + object_store_name,
-             "--object-store-manager-name=" + object_store_manager_name,
-             "--local-scheduler-name=" + local_scheduler_name,
-             "--redis-address=" + str(redis_address)]
-  p = subprocess.Popen(command, stdout=stdout_file, stderr=stderr_file)
+  command_args = [worker_path,
+                  "--node-ip-address=" + node_ip_address,
+                  "--object-store-name=" + object_store_name,
+                  "--object-store-manager-name=" + object_store_manager_name,
+                  "--local-scheduler-name=" + local_scheduler_name,
+                  "--redis-address=" + str(redis_address)]
+  env = None
+  if os.environ.get("RAY_WORKER_FAST_START", "1") != "0":
+    # Start the worker with -S to skip the site module and hand it this
+    # process's already computed module search path instead. Scanning the
+    # site directories (and executing their .pth files) in every worker adds
+    # up quickly when many workers start at once. Setting
+    # RAY_WORKER_FAST_START=0 restores the normal interpreter startup, for
+    # example if user code depends on site customizations.
+    command = [sys.executable, "-S"] + command_args
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(path for path in sys.path if path)
+  else:
+    command = ["python"] + command_args
+  p = subprocess.Popen(command, stdout=stdout_file, stderr=stderr_file,
+                       env=env, **_POPEN_KWARGS)
   if cleanup:
-    all_processes[PROCESS_TYPE_WORKER].append(p)
+    with all_processes_lock:
+      all_processes[PROCESS_TYPE_WORKER].append(p)
 
 def start_monitor(redis_address, stdout_file=None, stderr_file=None,
                   cleanup=True):
@@ -568,13 +910,14 @@ def start_monitor(redis_address, stdout_file=None, stderr_file=None,
       this process will be killed by services.cleanup() when the Python process
       that imported services exits. This is True by default.
   """
-  monitor_path= os.path.join(os.path.dirname(os.path.abspath(__file__)), "monitor.py")
   command = ["python",
-             monitor_path,
+             _MONITOR_PATH,
              "--redis-address=" + str(redis_address)]
-  p = subprocess.Popen(command, stdout=stdout_file, stderr=stderr_file)
+  p = subprocess.Popen(command, stdout=stdout_file, stderr=stderr_file,
+                       **_POPEN_KWARGS)
   if cleanup:
-    all_processes[PROCESS_TYPE_WORKER].append(p)
+    with all_processes_lock:
+      all_processes[PROCESS_TYPE_WORKER].append(p)
 
 def start_ray_processes(address_info=None,
                         node_ip_address="127.0.0.1",
@@ -628,7 +971,20 @@ def start_ray_processes(address_info=None,
       started.
   """
   if not isinstance(num_cpus, list):
-    num_cpus = num_local_schedulers * [num_cpus]
+    if num_cpus is None and num_local_schedulers > 1:
+      # Divide the available CPUs among the local schedulers so that together
+      # they do not oversubscribe the machine. Every local scheduler needs at
+      # least one CPU, since tasks require one CPU by default and a scheduler
+      # with zero CPUs could never run anything, so with more local schedulers
+      # than CPUs we oversubscribe slightly instead.
+      if _CPU_COUNT >= num_local_schedulers:
+        quotient, remainder = divmod(_CPU_COUNT, num_local_schedulers)
+        num_cpus = ([quotient + 1] * remainder +
+                    [quotient] * (num_local_schedulers - remainder))
+      else:
+        num_cpus = [1] * num_local_schedulers
+    else:
+      num_cpus = num_local_schedulers * [num_cpus]
   if not isinstance(num_gpus, list):
     num_gpus = num_local_schedulers * [num_gpus]
   assert len(num_cpus) == num_local_schedulers
@@ -639,7 +995,7 @@ def start_ray_processes(address_info=None,
   address_info["node_ip_address"] = node_ip_address
 
   if worker_path is None:
-    worker_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "workers/default_worker.py")
+    worker_path = _DEFAULT_WORKER_PATH
 
   # Start Redis if there isn't already an instance running. TODO(rkn): We are
   # suppressing the output of Redis because on Linux it prints a bunch of
@@ -655,13 +1011,11 @@ def start_ray_processes(address_info=None,
                                   cleanup=cleanup)
       redis_address = address(node_ip_address, redis_port)
       address_info["redis_address"] = redis_address
-      time.sleep(0.1)
     else:
       # A Redis address was provided, so start a Redis server with the given
       # port. TODO(rkn): We should check that the IP address corresponds to the
       # machine that this method is running on.
-      redis_ip_address = get_ip_address(redis_address)
-      redis_port = get_port(redis_address)
+      redis_ip_address, redis_port = parse_address(redis_address)
       new_redis_port, _ = start_redis(port=int(redis_port),
                                       num_retries=1,
                                       stdout_file=redis_stdout_file,
@@ -685,54 +1039,93 @@ def start_ray_processes(address_info=None,
                            stderr_file=global_scheduler_stderr_file,
                            cleanup=cleanup)
 
+  # Kick off the web UI in the background if requested. It only depends on
+  # Redis, so its warm-up overlaps with the object store, scheduler and worker
+  # startup below instead of running after all of them.
+  webui_started = [False]
+  webui_thread = None
+  if include_webui:
+    backend_stdout_file, backend_stderr_file = new_log_files("webui_backend",
+                                                             redirect_output=True)
+    polymer_stdout_file, polymer_stderr_file = new_log_files("webui_polymer",
+                                                             redirect_output=True)
+
+    def run_webui():
+      webui_started[0] = start_webui(redis_address,
+                                     backend_stdout_file=backend_stdout_file,
+                                     backend_stderr_file=backend_stderr_file,
+                                     polymer_stdout_file=polymer_stdout_file,
+                                     polymer_stderr_file=polymer_stderr_file,
+                                     cleanup=cleanup)
+
+    webui_thread = threading.Thread(target=run_webui)
+    webui_thread.start()
+
   # Initialize with existing services.
-  if "object_store_addresses" not in address_info:
-    address_info["object_store_addresses"] = []
-  object_store_addresses = address_info["object_store_addresses"]
-  if "local_scheduler_socket_names" not in address_info:
-    address_info["local_scheduler_socket_names"] = []
-  local_scheduler_socket_names = address_info["local_scheduler_socket_names"]
+  object_store_addresses = address_info.setdefault("object_store_addresses", [])
+  local_scheduler_socket_names = address_info.setdefault(
+      "local_scheduler_socket_names", [])
 
   # Get the ports to use for the object managers if any are provided.
-  object_manager_ports = address_info["object_manager_ports"] if "object_manager_ports" in address_info else None
-  if not isinstance(object_manager_ports, list):
-    object_manager_ports = num_local_schedulers * [object_manager_ports]
-  assert len(object_manager_ports) == num_local_schedulers
-
-  # Start any object stores that do not yet exist.
-  for i in range(num_local_schedulers - len(object_store_addresses)):
+  object_manager_ports = address_info.get("object_manager_ports")
+  if isinstance(object_manager_ports, list):
+    assert len(object_manager_ports) == num_local_schedulers
+    get_object_manager_port = object_manager_ports.__getitem__
+  else:
+    # Broadcast the scalar (usually None) to every index without materializing
+    # a throwaway list.
+    get_object_manager_port = lambda i: object_manager_ports
+
+  # Determine how many workers to start for each local scheduler. The first
+  # num_workers % num_local_schedulers schedulers get one extra worker, which
+  # matches distributing the workers round robin.
+  quotient, remainder = divmod(num_workers, num_local_schedulers)
+  num_workers_per_local_scheduler = ([quotient + 1] * remainder +
+                                     [quotient] * (num_local_schedulers - remainder))
+
+  num_existing_object_stores = len(object_store_addresses)
+  num_existing_local_schedulers = len(local_scheduler_socket_names)
+
+  # Determine how many workers each new local scheduler should start itself.
+  # The counts left in num_workers_per_local_scheduler are started from Python
+  # below. The start_workers_from_local_scheduler flag is loop-invariant, so
+  # it is evaluated once here with bulk slice assignments instead of
+  # per-scheduler. This bookkeeping mutates shared state, so it happens before
+  # any of the helpers run concurrently.
+  local_scheduler_worker_counts = [0] * num_local_schedulers
+  if start_workers_from_local_scheduler:
+    new_schedulers = slice(num_existing_local_schedulers, num_local_schedulers)
+    local_scheduler_worker_counts[new_schedulers] = (
+        num_workers_per_local_scheduler[new_schedulers])
+    num_workers_per_local_scheduler[new_schedulers] = (
+        [0] * (num_local_schedulers - num_existing_local_schedulers))
+
+  # Reserve a slot per index so that the concurrently executed helpers below
+  # can assign their results in place.
+  object_store_addresses.extend(
+      [None] * (num_local_schedulers - num_existing_object_stores))
+  local_scheduler_socket_names.extend(
+      [None] * (num_local_schedulers - num_existing_local_schedulers))
+
+  def start_objstore_helper(i):
     # Start Plasma.
     plasma_store_stdout_file, plasma_store_stderr_file = new_log_files("plasma_store_{}".format(i), redirect_output)
     plasma_manager_stdout_file, plasma_manager_stderr_file = new_log_files("plasma_manager_{}".format(i), redirect_output)
     object_store_address = start_objstore(node_ip_address, redis_address,
-                                          object_manager_port=object_manager_ports[i],
+                                          object_manager_port=get_object_manager_port(i),
                                           store_stdout_file=plasma_store_stdout_file,
                                           store_stderr_file=plasma_store_stderr_file,
                                           manager_stdout_file=plasma_manager_stdout_file,
                                           manager_stderr_file=plasma_manager_stderr_file,
                                           cleanup=cleanup)
-    object_store_addresses.append(object_store_address)
-    time.sleep(0.1)
-
-  # Determine how many workers to start for each local scheduler.
-  num_workers_per_local_scheduler = [0] * num_local_schedulers
-  for i in range(num_workers):
-    num_workers_per_local_scheduler[i % num_local_schedulers] += 1
+    # Wait for the plasma manager to accept connections so that the local
+    # scheduler started next does not race with it coming up.
+    _wait_ready_tcp(node_ip_address, object_store_address.manager_port)
+    return object_store_address
 
-  # Start any local schedulers that do not yet exist.
-  for i in range(len(local_scheduler_socket_names), num_local_schedulers):
+  def start_local_scheduler_helper(i, num_local_scheduler_workers):
     # Connect the local scheduler to the object store at the same index.
     object_store_address = object_store_addresses[i]
-    plasma_address = "{}:{}".format(node_ip_address,
-                                    object_store_address.manager_port)
-    # Determine how many workers this local scheduler should start.
-    if start_workers_from_local_scheduler:
-      num_local_scheduler_workers = num_workers_per_local_scheduler[i]
-      num_workers_per_local_scheduler[i] = 0
-    else:
-      # If we're starting the workers from Python, the local scheduler should
-      # not start any workers.
-      num_local_scheduler_workers = 0
     # Start the local scheduler.
     local_scheduler_stdout_file, local_scheduler_stderr_file = new_log_files("local_scheduler_{}".format(i), redirect_output)
     local_scheduler_name = start_local_scheduler(redis_address,
@@ -740,55 +1133,90 @@ def start_ray_processes(address_info=None,
                                                  object_store_address.name,
                                                  object_store_address.manager_name,
                                                  worker_path,
-                                                 plasma_address=plasma_address,
+                                                 plasma_address=object_store_address.plasma_address,
                                                  stdout_file=local_scheduler_stdout_file,
                                                  stderr_file=local_scheduler_stderr_file,
                                                  cleanup=cleanup,
                                                  num_cpus=num_cpus[i],
                                                  num_gpus=num_gpus[i],
                                                  num_workers=num_local_scheduler_workers)
-    local_scheduler_socket_names.append(local_scheduler_name)
-    time.sleep(0.1)
+    # Wait for the local scheduler to create its socket instead of sleeping
+    # for a fixed amount of time, so that workers started below do not race
+    # with the scheduler coming up.
+    _wait_ready_uds(local_scheduler_name)
+    return local_scheduler_name
+
+  def start_worker_helper(spawn_worker, i, j):
+    worker_stdout_file, worker_stderr_file = new_log_files("worker_{}_{}".format(i, j), redirect_output)
+    spawn_worker(stdout_file=worker_stdout_file,
+                 stderr_file=worker_stderr_file)
+
+  # The local scheduler at index i only depends on the object store at index
+  # i, and a worker only depends on its own local scheduler, so drive each
+  # index as its own chain instead of running the three phases back to back.
+  # End-to-end startup time is then the longest single chain rather than the
+  # sum of the phases.
+  worker_futures = []
+  worker_futures_lock = threading.Lock()
+
+  def start_node_services_helper(i, executor):
+    # Start the object store for this index if it does not exist yet.
+    if object_store_addresses[i] is None:
+      object_store_addresses[i] = start_objstore_helper(
+          i - num_existing_object_stores)
+    # Start the local scheduler for this index if it does not exist yet.
+    if local_scheduler_socket_names[i] is None:
+      local_scheduler_socket_names[i] = start_local_scheduler_helper(
+          i, local_scheduler_worker_counts[i])
+    # Everything except the log files is identical for all of this index's
+    # workers, so bind those arguments once instead of looking them up per
+    # worker.
+    object_store_address = object_store_addresses[i]
+    spawn_worker = functools.partial(start_worker,
+                                     node_ip_address,
+                                     object_store_address.name,
+                                     object_store_address.manager_name,
+                                     local_scheduler_socket_names[i],
+                                     redis_address,
+                                     worker_path,
+                                     cleanup=cleanup)
+    # Submit this index's share of the Python-started workers without waiting
+    # for them here, so that the chains for other indices are not blocked.
+    futures = [executor.submit(start_worker_helper, spawn_worker, i, j)
+               for j in range(num_workers_per_local_scheduler[i])]
+    with worker_futures_lock:
+      worker_futures.extend(futures)
+
+  num_python_workers = sum(num_workers_per_local_scheduler)
+  if num_local_schedulers == 1 and num_python_workers == 0:
+    # Fast path for the common driver case: a single local scheduler that
+    # starts its own workers. There is only one chain and nothing to submit to
+    # a pool, so run it inline and skip the executor entirely.
+    start_node_services_helper(0, None)
+  else:
+    num_spawn_tasks = num_local_schedulers + num_python_workers
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(num_spawn_tasks, 32)) as executor:
+      chain_futures = [executor.submit(start_node_services_helper, i, executor)
+                       for i in range(num_local_schedulers)]
+      for future in chain_futures:
+        future.result()
+      for future in worker_futures:
+        future.result()
+  # All of the remaining workers have now been started.
+  num_workers_per_local_scheduler = [0] * num_local_schedulers
 
   # Make sure that we have exactly num_local_schedulers instances of object
   # stores and local schedulers.
   assert len(object_store_addresses) == num_local_schedulers
   assert len(local_scheduler_socket_names) == num_local_schedulers
 
-  # Start any workers that the local scheduler has not already started.
-  for i, num_local_scheduler_workers in enumerate(num_workers_per_local_scheduler):
-    object_store_address = object_store_addresses[i]
-    local_scheduler_name = local_scheduler_socket_names[i]
-    for j in range(num_local_scheduler_workers):
-      worker_stdout_file, worker_stderr_file = new_log_files("worker_{}_{}".format(i, j), redirect_output)
-      start_worker(node_ip_address,
-                   object_store_address.name,
-                   object_store_address.manager_name,
-                   local_scheduler_name,
-                   redis_address,
-                   worker_path,
-                   stdout_file=worker_stdout_file,
-                   stderr_file=worker_stderr_file,
-                   cleanup=cleanup)
-      num_workers_per_local_scheduler[i] -= 1
-
   # Make sure that we've started all the workers.
   assert(sum(num_workers_per_local_scheduler) == 0)
 
-  # Try to start the web UI.
-  if include_webui:
-    backend_stdout_file, backend_stderr_file = new_log_files("webui_backend",
-                                                             redirect_output=True)
-    polymer_stdout_file, polymer_stderr_file = new_log_files("webui_polymer",
-                                                             redirect_output=True)
-    successfully_started = start_webui(redis_address,
-                                       backend_stdout_file=backend_stdout_file,
-                                       backend_stderr_file=backend_stderr_file,
-                                       polymer_stdout_file=polymer_stdout_file,
-                                       polymer_stderr_file=polymer_stderr_file,
-                                       cleanup=cleanup)
-
-    if successfully_started:
+  # Wait for the web UI startup that was kicked off above.
+  if webui_thread is not None:
+    webui_thread.join()
+    if webui_started[0]:
       print("View the web UI at http://localhost:8080.")
 
   # Return the addresses of the relevant processes.
@@ -899,7 +1327,7 @@ def start_ray_head(address_info=None,
                              num_gpus=num_gpus)
 
 def new_log_files(name, redirect_output):
-  """Generate partially randomized filenames for log files.
+  """Generate unique filenames for log files.
 
   Args:
     name (str): descriptive string for this log file.
@@ -914,12 +1342,21 @@ def new_log_files(name, redirect_output):
   if not redirect_output:
     return None, None
 
-  logs_dir = "/tmp/raylogs"
-  if not os.path.exists(logs_dir):
-    os.makedirs(logs_dir)
-  log_id = random.randint(0, 100000)
-  log_stdout = "{}/{}-{:06d}.out".format(logs_dir, name, log_id)
-  log_stderr = "{}/{}-{:06d}.err".format(logs_dir, name, log_id)
-  log_stdout_file = open(log_stdout, "a")
-  log_stderr_file = open(log_stderr, "a")
+  global _logs_dir_created
+  if not _logs_dir_created:
+    try:
+      os.makedirs(_LOGS_DIR)
+    except OSError:
+      # The directory already exists.
+      pass
+    _logs_dir_created = True
+  log_id = next(_log_id_counter)
+  log_stdout = "{}/{}-{}-{:08d}.out".format(_LOGS_DIR, name, os.getpid(), log_id)
+  log_stderr = "{}/{}-{}-{:08d}.err".format(_LOGS_DIR, name, os.getpid(), log_id)
+  # These handles are passed straight to the child processes, which write to
+  # the underlying descriptors directly, and the parent never writes to them.
+  # Open them unbuffered so no Python-side buffer is allocated (or flushed at
+  # cleanup) for each of them.
+  log_stdout_file = open(log_stdout, "ab", 0)
+  log_stderr_file = open(log_stderr, "ab", 0)
   return log_stdout_file, log_stderr_file
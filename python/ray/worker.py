@@ -764,7 +764,8 @@ def get_address_info_from_redis_helper(redis_address, node_ip_address):
         services.ObjectStoreAddress(
           name=manager[b"store_socket_name"].decode("ascii"),
           manager_name=manager[b"manager_socket_name"].decode("ascii"),
-          manager_port=port
+          manager_port=port,
+          plasma_address=address
           )
         )
   scheduler_names = [scheduler[b"local_scheduler_socket_name"].decode("ascii")
@@ -4,10 +4,21 @@ from __future__ import print_function
 
 import os
 import subprocess
+import sys
 
 from setuptools import setup, find_packages
 import setuptools.command.install as _install
 
+requires = ["numpy",
+            "funcsigs",
+            "colorama",
+            "psutil",
+            "redis",
+            "cloudpickle >= 0.2.2"]
+if sys.version_info < (3, 0):
+  # The concurrent.futures module is only in the standard library in Python 3.
+  requires.append("futures")
+
 class install(_install.install):
   def run(self):
     subprocess.check_call(["../build.sh"])
@@ -30,12 +41,7 @@ setup(name="ray",
                             "core/src/numbuf/libnumbuf.so",
                             "core/src/global_scheduler/global_scheduler"]},
       cmdclass={"install": install},
-      install_requires=["numpy",
-                        "funcsigs",
-                        "colorama",
-                        "psutil",
-                        "redis",
-                        "cloudpickle >= 0.2.2"],
+      install_requires=requires,
       include_package_data=True,
       zip_safe=False,
       license="Apache 2.0")